@@ -1,28 +1,171 @@
 #!/usr/bin/env python3
 from pathlib import Path
+import csv
+import io
 import re
+import numpy as np
 import pandas as pd
 
 # Default file to use if none is provided by callers
 FNAME = "/qvs-storage/VMRMS/2025/08/gauge/ALLSETS/GAUGE_1H_MRMS_QC.20250811.230000"
 
+# Leading columns of each gauge data line
+GAUGE_COLS = ["G_ID", "Lat", "Lon", "T_Shift", "G_Value", "QC_Flag"]
+
+# Bytes of whole lines parsed per chunk (~170k rows); bounds the working set on very large files
+CHUNK_BYTES = 8 << 20
+
+# Parse dtype of each numeric column. The integer columns go through float64 (exact to
+# 2**53, so large flags survive) and are truncated like int(float(x)) once NaN rows are
+# dropped (see to_int).
+_NUM_FLOAT = {"Lat": np.float32, "Lon": np.float32, "T_Shift": np.float64,
+              "G_Value": np.float32, "QC_Flag": np.float64}
+
+# Typed parse of the data columns. G_ID is kept verbatim (a gauge called "NA" is not
+# missing); only the numeric columns treat the usual NA spellings, and the column-header
+# keywords, as NaN.
+_NUM_DTYPES = {"G_ID": str, **_NUM_FLOAT}
+_NUM_NA = {c: ["", "NA", "N/A", "NaN", "nan", "NULL", "null", *GAUGE_COLS]
+           for c in GAUGE_COLS[1:]}
+
+# Integer columns are stored as int32 unless a value needs int64
+_INT32 = np.iinfo(np.int32)
+
+# Lines scanned for a leading header/explanation block before giving up
+PREAMBLE_MAX_LINES = 1000
+
+# ...YYYYMMDD.HH0000 suffix of gauge file names
+_FNAME_RE = re.compile(r'\.(\d{8})\.(\d{2})0000$')
+
 
 # Helper Functions
 def infer_file_time_utc(fname: str) -> pd.Timestamp:
     """Parse ...YYYYMMDD.HH0000 from filename and return tz-aware UTC timestamp."""
-    m = re.search(r'\.(\d{8})\.(\d{2})0000$', Path(fname).name)
+    m = _FNAME_RE.search(Path(fname).name)
     if not m:
         raise ValueError(f"Filename must end with .YYYYMMDD.HH0000: {fname}")
     ymd, hh = m.group(1), m.group(2)
     return pd.Timestamp(int(ymd[:4]), int(ymd[4:6]), int(ymd[6:]), int(hh), 0, 0, tz='UTC')
 
-def line_is_data(s: str) -> bool:
-    """Keep only likely data lines."""
-    if not s or s.startswith("#"):
-        return False
-    # toss obvious headers/explanations
-    bad_keys = ("G_ID", "Lat", "Lon", "T_Shift", "G_Value", "QC_Flag", "Gauge station ID")
-    return not any(k in s for k in bad_keys)
+def count_preamble_lines(fname: str) -> int:
+    """Number of lines before the first data line (headers, explanations, comments)."""
+    # binary, so lines split on b"\n" only, exactly as iter_line_blocks skips them
+    # (text mode would also break at a stray \r and overcount)
+    with open(fname, "rb") as f:
+        for i, line in enumerate(f):
+            if i >= PREAMBLE_MAX_LINES:
+                return 0  # no data up front; leave it to the readers
+            parts = line.split(b"#", 1)[0].split()
+            if len(parts) < 6:
+                continue
+            try:
+                for x in parts[1:6]:
+                    float(x)
+            except ValueError:
+                continue
+            return i
+    return 0
+
+def to_int(a: np.ndarray) -> np.ndarray:
+    """Truncate finite float values to int32, or to int64 if any falls outside int32."""
+    if a.size and (a.min() < _INT32.min or a.max() > _INT32.max):
+        return a.astype(np.int64)
+    return a.astype(np.int32)
+
+def iter_line_blocks(fname: str, skip_lines=0, block_bytes=CHUNK_BYTES):
+    """Yield the file after its first skip_lines lines as bytes blocks of whole lines."""
+    with open(fname, "rb") as f:
+        for _ in range(skip_lines):
+            f.readline()
+        while block := f.read(block_bytes):
+            yield block + f.readline()  # run on to the end of the cut line
+
+def iter_gauge_chunks_pandas(fname: str, typed=True, chunk_bytes=CHUNK_BYTES):
+    """
+    Yield the 6 gauge columns in chunks streamed from fname by pandas' C tokenizer,
+    dropping header, short and non-finite rows. With typed=True numbers are parsed in C
+    and a non-numeric field raises ValueError; typed=False reads text and coerces such
+    rows away instead.
+    """
+    # Whitespace-delimited; the C tokenizer keeps the first 6 fields of each line and,
+    # like str.split(), treats quotes as ordinary characters.
+    # A header/explanation block at the top is skipped outright; a repeated column
+    # header row further down parses as NaN (see _NUM_NA) and is dropped below.
+    opts = dict(sep=r"\s+", comment="#", header=None, names=GAUGE_COLS, usecols=range(6),
+                quoting=csv.QUOTE_NONE, on_bad_lines="skip", engine="c",
+                encoding="utf-8", encoding_errors="ignore")
+    if typed:
+        # numbers are converted in C straight into float32/float64 columns
+        opts.update(dtype=_NUM_DTYPES, keep_default_na=False, na_values=_NUM_NA)
+    else:
+        opts.update(dtype=str, na_filter=False)
+
+    # Each block is its own read_csv call rather than a read_csv(chunksize=) chunk:
+    # pandas raises on a chunk with no 6-field line (say a trailer that lands in a chunk
+    # of its own) and its reader can't be resumed past that.
+    for block in iter_line_blocks(fname, count_preamble_lines(fname), chunk_bytes):
+        try:
+            raw = pd.read_csv(io.BytesIO(block), **opts)
+        except pd.errors.ParserError:
+            if any(len(line.split(b"#", 1)[0].split()) >= 6 for line in block.splitlines()):
+                raise
+            continue  # nothing but short lines, so no rows to keep
+
+        if typed:
+            num = {c: raw[c].to_numpy(t) for c, t in _NUM_FLOAT.items()}
+        else:
+            num = {c: pd.to_numeric(raw[c], errors="coerce").to_numpy(t)
+                   for c, t in _NUM_FLOAT.items()}
+
+        # toss short and weird rows (NaN/inf in any numeric field, or an integer field
+        # too big for int64)
+        ok = np.isfinite(np.column_stack(list(num.values()))).all(axis=1)
+        for c in ("T_Shift", "QC_Flag"):
+            ok &= np.abs(num[c]) < 2.0 ** 63
+        if not ok.any():
+            continue
+
+        # one plain array per column; no per-column index alignment
+        yield pd.DataFrame({
+            "G_ID":    raw["G_ID"].to_numpy()[ok],
+            "Lat":     num["Lat"][ok],
+            "Lon":     num["Lon"][ok],
+            "T_Shift": to_int(num["T_Shift"][ok]),
+            "G_Value": num["G_Value"][ok],
+            "QC_Flag": to_int(num["QC_Flag"][ok]),
+        })
+
+def qc_mask(qc: np.ndarray, qc_keep) -> np.ndarray:
+    """Boolean mask of rows whose QC flag is in qc_keep."""
+    # qc_keep is usually {0} or {0, 1}: a couple of == scans on the int array
+    # beat a set lookup per row
+    mask = np.zeros(len(qc), dtype=bool)
+    for flag in set(qc_keep):
+        mask |= qc == flag
+    return mask
+
+def read_gauge_cols(fname: str, qc_keep=None) -> tuple[pd.DataFrame, int]:
+    """
+    Read the 6 gauge columns, QC-filtering chunk by chunk so only kept rows pile up.
+    Returns the kept rows and the number of valid rows before QC filtering.
+    """
+    def keep(chunks):
+        parts, n_valid = [], 0
+        for chunk in chunks:
+            n_valid += len(chunk)
+            if qc_keep is not None:
+                chunk = chunk[qc_mask(chunk["QC_Flag"].to_numpy(), qc_keep)]
+            parts.append(chunk)
+        if not parts:
+            return pd.DataFrame(columns=GAUGE_COLS), 0
+        return pd.concat(parts, ignore_index=True), n_valid
+
+    # typed read first; a non-numeric field past the preamble means re-reading the
+    # file as text and coercing (the typed chunks read so far are discarded)
+    try:
+        return keep(iter_gauge_chunks_pandas(fname))
+    except ValueError:
+        return keep(iter_gauge_chunks_pandas(fname, typed=False))
 
 # Main Parsing Function
 def parse_gauge_file_to_table1(fname: str, qc_keep=None) -> pd.DataFrame:
@@ -32,49 +175,27 @@ def parse_gauge_file_to_table1(fname: str, qc_keep=None) -> pd.DataFrame:
     """
     base = infer_file_time_utc(fname)
 
-    recs = []
-    with open(fname, "r", encoding="utf-8", errors="ignore") as f:
-        for line in f:
-            s = line.strip()
-            if not line_is_data(s):
-                continue
-            parts = s.split()
-            if len(parts) < 6:
-                continue  # skip malformed
-            gid, lat, lon, tshift, gval, qc = parts[:6]
-            try:
-                recs.append({
-                    "G_ID": gid,
-                    "Lat": float(lat),
-                    "Lon": float(lon),
-                    "T_Shift": int(float(tshift)),
-                    "G_Value": float(gval),
-                    "QC_Flag": int(float(qc)),
-                })
-            except Exception:
-                continue  # skip weird rows
-
-    if not recs:
+    df, n_valid = read_gauge_cols(fname, qc_keep=qc_keep)
+    if n_valid == 0:
         raise ValueError(f"No valid rows parsed from {fname}")
 
-    df = pd.DataFrame(recs)
-
-    if qc_keep is not None:
-        df = df[df["QC_Flag"].isin(set(qc_keep))]
-
-    df["Time"] = base + pd.to_timedelta(df["T_Shift"], unit="m")
+    # per-gauge valid time = file hour + T_Shift minutes, as plain datetime64 math
+    base_ns = base.tz_convert(None).to_datetime64().astype("datetime64[ns]")
+    times = base_ns + df["T_Shift"].to_numpy(np.int64) * np.timedelta64(60, "s")
 
-    # Table-1 schema
+    # Table-1 schema, built from the column arrays so nothing is re-aligned on the index.
+    # Obs ID categories are always str, even when QC filtering left no rows, so the
+    # frames of several files can be unioned.
     out = pd.DataFrame({
-        "Obs ID":    df["G_ID"].astype("string"),
-        "Obs value": df["G_Value"].astype(float),
-        "Lat.":      df["Lat"].astype(float),
-        "Long.":     df["Lon"].astype(float),
-        "Time":      df["Time"],          # tz-aware UTC
+        "Obs ID":    pd.Categorical(df["G_ID"].astype("str")),
+        "Obs value": df["G_Value"].to_numpy(np.float32),
+        "Lat.":      df["Lat"].to_numpy(np.float32),
+        "Long.":     df["Lon"].to_numpy(np.float32),
+        "Time":      pd.to_datetime(times, utc=True),  # tz-aware UTC
         "Q3Rad":     pd.NA,               # fill later from radar
         "2m_temp":   pd.NA,               # fill later from met data
         "N":         pd.NA,               # fill later (neighbors, etc.)
-    }).reset_index(drop=True)
+    })
 
     return out
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+import warnings
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from parse_gauge import FNAME, parse_gauge_file_to_table1
+
+# Default directory: the one holding parse_gauge's default file
+GAUGE_DIR = str(Path(FNAME).parent)
+
+
+# Helper Functions
+def parse_one(fname: str, qc_keep=None):
+    """Table-1 DataFrame for fname, or the ValueError raised for a file with no valid rows."""
+    try:
+        return parse_gauge_file_to_table1(fname, qc_keep=qc_keep)
+    except ValueError as e:
+        return e
+
+# Main Parsing Function
+def parse_gauge_dir(dirname: str, qc_keep=None,
+                    pattern="GAUGE_1H_MRMS_QC.????????.??0000",
+                    max_workers=None) -> pd.DataFrame:
+    """
+    Parse every gauge file in dirname matching pattern and stack them into one
+    Table-1 DataFrame (same columns as parse_gauge_file_to_table1). Files with no
+    valid rows (e.g. an hour with no data lines) are skipped with a warning.
+    """
+    fnames = sorted(str(p) for p in Path(dirname).glob(pattern) if p.is_file())
+    if not fnames:
+        raise ValueError(f"No gauge files matching {pattern} in {dirname}")
+
+    # pandas tokenizes and converts numbers with the GIL released, so files overlap
+    # on a thread pool (the per-chunk DataFrame assembly still takes turns on the GIL).
+    # Each reader is single-threaded, so one worker per core doesn't oversubscribe.
+    workers = max_workers or min(len(fnames), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda f: parse_one(f, qc_keep), fnames))
+
+    # one bad hour shouldn't sink the whole directory
+    skipped = [str(r) for r in results if isinstance(r, ValueError)]
+    frames = [r for r in results if not isinstance(r, ValueError)]
+    if skipped:
+        warnings.warn("Skipped gauge files with no valid rows:\n  " + "\n  ".join(skipped))
+    if not frames:
+        raise ValueError(f"No valid rows in any gauge file matching {pattern} in {dirname}")
+
+    # Stack once; Obs ID categories are unioned so the codes stay categorical
+    # instead of decaying to one string object per row.
+    ids = union_categoricals([f["Obs ID"].array for f in frames])
+    out = pd.concat([f.drop(columns="Obs ID") for f in frames], ignore_index=True)
+    out.insert(0, "Obs ID", ids)
+
+    return out
+
+if __name__ == "__main__":
+    df = parse_gauge_dir(GAUGE_DIR, qc_keep=None)  # or qc_keep={0}
+    print(f"Parsed rows: {len(df)}")
+    print(f"Distinct gauges: {df['Obs ID'].cat.categories.size}")
+
+    print("\nFirst 10 rows:")
+    print(df.head(10).to_string(index=False))
@@ -3,134 +3,240 @@ from pathlib import Path
 import argparse
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # we only write PNGs; skip GUI backend setup
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 
 # Import the data from parse_gauge.py
 from parse_gauge import parse_gauge_file_to_table1
 
-def mm_to_inches(x_mm: pd.Series) -> pd.Series:
-    return x_mm / 25.4
+_INCHES_PER_MM = np.float32(1 / 25.4)
+
+def mm_to_inches(x_mm) -> np.ndarray:
+    # multiply by the reciprocal on the raw float32 array; no Series/index allocation
+    return np.multiply(np.asarray(x_mm, dtype=np.float32), _INCHES_PER_MM, dtype=np.float32)
 
 # Choose colorbar min/max based on data, with optional quantile clamp
 def choose_color_limits(series: pd.Series, vmin=0.0, vmax=None, clamp_q=0.99):
     if vmax is None:
-        vmax = float(series.quantile(clamp_q)) if series.size else 1.0
+        vmax = float(np.nanquantile(np.asarray(series), clamp_q)) if series.size else 1.0
         if vmax <= vmin:
             vmax = vmin + 1.0
     return vmin, vmax
 
 # Compute map extent with padding
 def auto_extent(lons: pd.Series, lats: pd.Series, pad_deg=2.0):
+    lo, la = np.asarray(lons), np.asarray(lats)
     return [
-        float(lons.min()) - pad_deg,
-        float(lons.max()) + pad_deg,
-        float(lats.min()) - pad_deg,
-        float(lats.max()) + pad_deg,
+        float(lo.min()) - pad_deg,
+        float(lo.max()) + pad_deg,
+        float(la.min()) - pad_deg,
+        float(la.max()) + pad_deg,
     ]
 
+# NWS-style colormap and normalization for precipitation in inches, built once at import
+_NWS_PRECIP_LEVELS = [
+    0.01, 0.05, 0.10, 0.20, 0.40, 0.60, 0.80, 1.00, 1.25, 1.50, 1.75, 2.00,
+    2.50, 3.00, 3.50, 4.00, 5.00, 6.00, 7.00, 8.00, 9.00, 10.00, 11.00, 12.00
+]
+_NWS_PRECIP_CMAP = mcolors.ListedColormap([
+    "#b3ecff", "#66d9ff", "#1fa3ff", "#0090ff", "#00e600", "#00b300", "#33cc33", "#99e600",
+    "#ffff00", "#ffd700", "#ffb300", "#ff9900", "#ff6600", "#ff0000", "#e60073", "#cc00cc",
+    "#8000ff", "#b266ff", "#e6e6fa", "#f0f8ff", "#e0ffff", "#f5f5dc", "#ffffe0"
+], name="nws_precip")
+_NWS_PRECIP_NORM = mcolors.BoundaryNorm(_NWS_PRECIP_LEVELS, _NWS_PRECIP_CMAP.N)
+
 # Returns NWS-style colormap and normalization for precipitation in inches
 def get_nws_precip_cmap_and_norm(units_label="in"):
-    levels_in = [
-        0.01, 0.05, 0.10, 0.20, 0.40, 0.60, 0.80, 1.00, 1.25, 1.50, 1.75, 2.00,
-        2.50, 3.00, 3.50, 4.00, 5.00, 6.00, 7.00, 8.00, 9.00, 10.00, 11.00, 12.00
-    ]
-    colors = [
-        "#b3ecff", "#66d9ff", "#1fa3ff", "#0090ff", "#00e600", "#00b300", "#33cc33", "#99e600",
-        "#ffff00", "#ffd700", "#ffb300", "#ff9900", "#ff6600", "#ff0000", "#e60073", "#cc00cc",
-        "#8000ff", "#b266ff", "#e6e6fa", "#f0f8ff", "#e0ffff", "#f5f5dc", "#ffffe0"
-    ]
-    cmap = mcolors.ListedColormap(colors, name="nws_precip")
-    norm = mcolors.BoundaryNorm(levels_in, cmap.N)
-    return cmap, norm, levels_in
+    return _NWS_PRECIP_CMAP, _NWS_PRECIP_NORM, _NWS_PRECIP_LEVELS
+
+# NWS-style bins (inches), colors, and marker sizes, built once and shared by every plot.
+# The bin edges go through the same float32 mm -> inches conversion as the gauge values,
+# so a reading exactly on an edge (a 0.254 mm or 1.27 mm tip) rounds alike and stays in
+# the lower bin.
+_NWS_BINS = mm_to_inches(np.float32(np.array([
+    0.01, 0.05, 0.10, 0.20, 0.40, 0.60, 0.80, 1.00, 1.25, 1.50, 1.75, 2.00,
+    2.50, 3.00, 3.50, 4.00, 5.00
+]) * 25.4))
+_NWS_COLORS = np.array([
+    "#b3ecff", "#66d9ff", "#1fa3ff", "#0090ff",
+    "#00e600", "#00b300", "#33cc33", "#99e600",
+    "#ffff00", "#ffd700", "#ffb300", "#ff9900",
+    "#ff6600", "#ff0000", "#e60073", "#cc00cc",
+    "#8000ff"
+])
+_NWS_SIZES = np.array([
+    18, 18, 22, 22,
+    30, 34, 38, 42,
+    60, 70, 80, 90,
+    110, 130, 150, 170, 200
+], dtype=np.int16)
+_NWS_CMAP = mcolors.ListedColormap(_NWS_COLORS)
+_NWS_NORM = mcolors.BoundaryNorm(np.concatenate((np.float32([0]), _NWS_BINS)), len(_NWS_COLORS))
+# Rasterized layers hold assign_bins indices, so the image colors match the markers' bins
+_NWS_INDEX_NORM = mcolors.BoundaryNorm(np.arange(len(_NWS_COLORS) + 1) - 0.5, len(_NWS_COLORS))
 
 # Returns bins, colors, and marker sizes for NWS-style precipitation plotting
 def get_nws_bins_and_colors():
-    bins = np.array([
-        0.01, 0.05, 0.10, 0.20, 0.40, 0.60, 0.80, 1.00, 1.25, 1.50, 1.75, 2.00,
-        2.50, 3.00, 3.50, 4.00, 5.00
-    ])
-    colors = [
-        "#b3ecff", "#66d9ff", "#1fa3ff", "#0090ff",
-        "#00e600", "#00b300", "#33cc33", "#99e600",
-        "#ffff00", "#ffd700", "#ffb300", "#ff9900",
-        "#ff6600", "#ff0000", "#e60073", "#cc00cc",
-        "#8000ff"
-    ]
-    sizes = [
-        18, 18, 22, 22,
-        30, 34, 38, 42,
-        60, 70, 80, 90,
-        110, 130, 150, 170, 200
-    ]
-    return bins, colors, sizes
+    return _NWS_BINS, _NWS_COLORS, _NWS_SIZES
 
 # Assign each value to a color and size bin
 def assign_bins(vals, bins, colors, sizes):
-    inds = np.digitize(vals, bins, right=True)
-    inds = np.clip(inds, 0, len(colors)-1)
-    return np.array(colors)[inds], np.array(sizes)[inds], inds
+    # same as np.digitize(..., right=True); asarray is a no-op on the cached NWS arrays
+    colors, sizes = np.asarray(colors), np.asarray(sizes)
+    inds = np.searchsorted(bins, vals, side="left").clip(0, colors.size - 1)
+    return colors[inds], sizes[inds], inds
 
-# Plot precipitation data on a Cartopy map with NWS-style bins and colorbar
-def plot_cartopy(df: pd.DataFrame, vals: pd.Series, *, units_label: str,
-                 title: str, out_png: Path, vmin=0.0, vmax=None):
+# Pixels each rasterized gauge is grown by on every side (1 -> a 3x3 block)
+RASTER_SPREAD_PX = 1
+
+# Max value per pixel on a width x height grid covering extent (in the x/y coordinates'
+# own units), each point spread to its neighbours; NaN where there are no points
+def rasterize_max(x, y, vals, extent, width, height, spread_px=RASTER_SPREAD_PX):
     try:
-        import cartopy.crs as ccrs
-        import cartopy.feature as cfeature
+        import datashader as ds
+        import datashader.transfer_functions as tf
     except Exception as e:
-        raise RuntimeError(
-            "Cartopy not available. Install it or use --no-map to use the quick scatter."
-        ) from e
+        raise RuntimeError("Datashader not available. Install it or drop --rasterize.") from e
+
+    xmin, xmax, ymin, ymax = extent
+    pts = pd.DataFrame({"x": np.asarray(x), "y": np.asarray(y), "v": np.asarray(vals)})
+    cvs = ds.Canvas(plot_width=width, plot_height=height,
+                    x_range=(xmin, xmax), y_range=(ymin, ymax))
+    agg = cvs.points(pts, "x", "y", ds.max("v"))
+    if spread_px:
+        # a lone 1-pixel gauge is easy to miss; the max keeps the wettest of any overlap
+        agg = tf.spread(agg, px=spread_px, how="max")
+    return agg.to_numpy()  # row 0 is ymin
+
+# Draw gauges as one image in the map's own projection, one grid cell per screen pixel
+# of the (laid-out) axes, so the image is never resampled and no gauge drops out
+def imshow_rasterized(ax, proj_data, lon, lat, vals, **kwargs):
+    xy = ax.projection.transform_points(proj_data, np.asarray(lon, dtype=np.float64),
+                                        np.asarray(lat, dtype=np.float64))
+    extent = ax.get_extent()  # projected x/y of the current view
+    ax.apply_aspect()
+    bbox = ax.get_window_extent()
+    grid = rasterize_max(xy[:, 0], xy[:, 1], vals, extent,
+                         width=max(int(round(bbox.width)), 1), height=max(int(round(bbox.height)), 1))
+    return ax.imshow(grid, origin="lower", extent=extent, interpolation="nearest",
+                     transform=ax.projection, **kwargs)
+
+# Map figures keyed by (figsize, dpi): (fig, ax, proj_data, artists, subplotspec)
+_FIGURES = {}
 
-    proj_data = ccrs.PlateCarree()
-    proj_view = ccrs.LambertConformal(central_longitude=-96, central_latitude=39)
+# Build (once) a Cartopy map figure with coastlines/borders/states and return it.
+# Later calls hand back the same figure with the previous plot's data artists removed,
+# so the map features are only built and decoded once per process. Callers append
+# whatever they draw (scatters, images, colorbars) to the returned artists list; they
+# are removed newest first, so a colorbar goes away while its mappable is still attached.
+def build_figure(figsize=(10.5, 7.5), dpi=150):
+    entry = _FIGURES.get((figsize, dpi))
+    if entry is None:
+        try:
+            import cartopy.crs as ccrs
+            import cartopy.feature as cfeature
+        except Exception as e:
+            raise RuntimeError(
+                "Cartopy not available. Install it or use --no-map to use the quick scatter."
+            ) from e
 
-    fig = plt.figure(figsize=(10.5, 7.5), dpi=150)
-    ax = plt.axes(projection=proj_view)
+        proj_data = ccrs.PlateCarree()
+        proj_view = ccrs.LambertConformal(central_longitude=-96, central_latitude=39)
 
-    ax.add_feature(cfeature.COASTLINE.with_scale("50m"), linewidth=0.6)
-    ax.add_feature(cfeature.BORDERS.with_scale("50m"), linewidth=0.6)
-    ax.add_feature(cfeature.STATES.with_scale("50m"), linewidth=0.4, edgecolor="k")
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+        ax = fig.add_subplot(projection=proj_view)
 
-    zeros = df[vals == 0]
-    nonzeros = df[vals > 0]
-    nonzero_vals = vals[vals > 0]
+        ax.add_feature(cfeature.COASTLINE.with_scale("50m"), linewidth=0.6)
+        ax.add_feature(cfeature.BORDERS.with_scale("50m"), linewidth=0.6)
+        ax.add_feature(cfeature.STATES.with_scale("50m"), linewidth=0.4, edgecolor="k")
+
+        entry = _FIGURES[(figsize, dpi)] = (fig, ax, proj_data, [], ax.get_subplotspec())
+        return entry[:4]
+
+    # drop the previous plot's scatters/images/colorbar but keep the map features,
+    # then undo the colorbar's space steal and the last tight_layout so every plot
+    # starts from the same layout
+    fig, ax, proj_data, artists, subplotspec = entry
+    for artist in reversed(artists):
+        artist.remove()
+    artists.clear()
+    ax.set_subplotspec(subplotspec)
+    fig.subplots_adjust(**{k: plt.rcParams[f"figure.subplot.{k}"]
+                           for k in ("left", "right", "bottom", "top")})
+
+    return entry[:4]
+
+# Plot precipitation data on a Cartopy map with NWS-style bins and colorbar
+def plot_cartopy(df: pd.DataFrame, vals: np.ndarray, *, units_label: str,
+                 title: str, out_png: Path, vmin=0.0, vmax=None, rasterize=False):
+    fig, ax, proj_data, artists = build_figure()
+
+    # Split zero/nonzero gauges once on plain arrays; no intermediate DataFrames
+    v = np.asarray(vals)
+    lon, lat = df["Long."].to_numpy(), df["Lat."].to_numpy()
+    z_mask, nz_mask = v == 0, v > 0
+    nz_vals, nz_lon, nz_lat = v[nz_mask], lon[nz_mask], lat[nz_mask]
+
+    # set the view first: rasterized layers are gridded over the current view
+    xmin, xmax, ymin, ymax = auto_extent(lon, lat, pad_deg=2.0)
+    ax.set_extent([xmin, xmax, ymin, ymax], crs=proj_data)
 
     # Plot zero-precip points as green pluses underneath
-    if not zeros.empty:
-        ax.scatter(zeros["Long."], zeros["Lat."], marker="+", color="green", s=12,
-                   label="0 in", transform=proj_data, zorder=1)
+    if z_mask.any() and not rasterize:
+        artists.append(ax.scatter(lon[z_mask], lat[z_mask], marker="+", color="green", s=12,
+                                  label="0 in", transform=proj_data, zorder=1))
 
     # Plot nonzero points as colored circles with black outline
-    if not nonzeros.empty and units_label == "in":
+    if nz_vals.size and units_label == "in":
         bins, colors, sizes = get_nws_bins_and_colors()
-        c, s, inds = assign_bins(nonzero_vals, bins, colors, sizes)
-        sc = ax.scatter(nonzeros["Long."], nonzeros["Lat."], c=c, s=s,
-                        marker="o", edgecolor="black", linewidth=0.7, transform=proj_data, zorder=3)
-
-        from matplotlib.colors import ListedColormap, BoundaryNorm
-        cmap = ListedColormap(colors)
-        norm = BoundaryNorm(np.concatenate(([0], bins)), len(colors))
-        cbar = plt.colorbar(
-            plt.cm.ScalarMappable(norm=norm, cmap=cmap),
+        c, s, inds = assign_bins(nz_vals, bins, colors, sizes)
+        if not rasterize:
+            sc = ax.scatter(nz_lon, nz_lat, c=c, s=s, marker="o",
+                            edgecolor="black", linewidth=0.7, transform=proj_data, zorder=3)
+            artists.append(sc)
+
+        cbar = fig.colorbar(
+            plt.cm.ScalarMappable(norm=_NWS_NORM, cmap=_NWS_CMAP),
             ax=ax, orientation="vertical", fraction=0.035, pad=0.04, ticks=bins
         )
         cbar.set_label("Precipitation (inches)")
         cbar.ax.set_yticklabels([f"{b:.2f}" for b in bins])
+        artists.append(cbar)
 
     # fallback for mm or other units
-    elif not nonzeros.empty:
-        sc = ax.scatter(nonzeros["Long."], nonzeros["Lat."], c=nonzero_vals, s=30,
-                        cmap="viridis", edgecolor="black", linewidth=0.7, transform=proj_data, label=">0", zorder=3)
-        cbar = plt.colorbar(sc, ax=ax, orientation="vertical", fraction=0.035, pad=0.04)
+    elif nz_vals.size:
+        if rasterize:
+            # the image comes after layout; the colorbar gets the scatter's autoscaled limits
+            mm_norm = mcolors.Normalize(float(nz_vals.min()), float(nz_vals.max()))
+            cbar = fig.colorbar(plt.cm.ScalarMappable(norm=mm_norm, cmap="viridis"),
+                                ax=ax, orientation="vertical", fraction=0.035, pad=0.04)
+            artists.append(cbar)
+        else:
+            sc = ax.scatter(nz_lon, nz_lat, c=nz_vals, s=30,
+                            cmap="viridis", edgecolor="black", linewidth=0.7, transform=proj_data, label=">0", zorder=3)
+            cbar = fig.colorbar(sc, ax=ax, orientation="vertical", fraction=0.035, pad=0.04)
+            artists.extend([sc, cbar])
         cbar.set_label(f"Precipitation ({units_label})")
 
     ax.set_title(title)
 
-    xmin, xmax, ymin, ymax = auto_extent(df["Long."], df["Lat."], pad_deg=2.0)
-    ax.set_extent([xmin, xmax, ymin, ymax], crs=proj_data)
+    fig.tight_layout()
+
+    # Dense networks: one image per layer instead of N markers, sized once the layout
+    # (colorbar, title) has settled so a grid cell is exactly one output pixel
+    if rasterize:
+        if z_mask.any():
+            artists.append(imshow_rasterized(ax, proj_data, lon[z_mask], lat[z_mask], v[z_mask],
+                                             cmap=mcolors.ListedColormap(["green"]), zorder=1))
+        if nz_vals.size and units_label == "in":
+            artists.append(imshow_rasterized(ax, proj_data, nz_lon, nz_lat, inds,
+                                             cmap=_NWS_CMAP, norm=_NWS_INDEX_NORM, zorder=3))
+        elif nz_vals.size:
+            artists.append(imshow_rasterized(ax, proj_data, nz_lon, nz_lat, nz_vals,
+                                             cmap="viridis", norm=mm_norm, zorder=3))
 
-    plt.tight_layout()
     fig.savefig(out_png, bbox_inches="tight")
     print(f"Wrote {out_png}")
 
@@ -149,6 +255,8 @@ def main():
     ap.add_argument("--units", choices=["mm", "in"], default="mm",
                     help="Units to display on the plot (and convert if needed).")
     ap.add_argument("--vmax", type=float, default=None, help="Override colorbar max.")
+    ap.add_argument("--rasterize", action="store_true",
+                    help="Draw gauges as datashader images instead of markers.")
     ap.add_argument("--out", type=str, default=None,
                     help="Output PNG path (default: same as input, but in current directory)")
     args = ap.parse_args()
@@ -160,15 +268,13 @@ def main():
     df = parse_gauge_file_to_table1(args.fname, qc_keep=set(args.qc_keep) if args.qc_keep else None)
     print("Parsed columns:", df.columns)
 
-    data = df.copy()
-    if args.hide_zeros:
-        data = data[data["Obs value"] > 0]
+    # plotting only reads the frame, so filter without copying it first
+    data = df[df["Obs value"] > 0] if args.hide_zeros else df
 
     if data.empty:
         raise SystemExit("No rows to plot after filtering.")
 
-    vals_mm = data["Obs value"].astype(float)
-    vals_in = mm_to_inches(vals_mm)
+    vals_in = mm_to_inches(data["Obs value"])
 
     tmin = pd.to_datetime(data["Time"].min())
     tmax = pd.to_datetime(data["Time"].max())
@@ -182,7 +288,8 @@ def main():
         plots_dir.mkdir(parents=True, exist_ok=True)
         out_png = plots_dir / (Path(args.fname).stem + ".png")
 
-    plot_cartopy(data, vals_in, units_label="in", title=title, out_png=out_png, vmax=args.vmax)
+    plot_cartopy(data, vals_in, units_label="in", title=title, out_png=out_png, vmax=args.vmax,
+                 rasterize=args.rasterize)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parse_gauge import (GAUGE_COLS, iter_gauge_chunks_pandas, parse_gauge_file_to_table1,
+                         read_gauge_cols)
+
+FNAME = "GAUGE_1H_MRMS_QC.20250811.230000"
+
+# The rows every fixture below should boil down to
+EXPECTED = pd.DataFrame({
+    "G_ID":    ["KOUN", "NA", "G3"],
+    "Lat":     np.array([35.2, 36.0, 37.5], dtype=np.float32),
+    "Lon":     np.array([-97.4, -98.0, -99.25], dtype=np.float32),
+    "T_Shift": np.array([0, -15, 30], dtype=np.int32),
+    "G_Value": np.array([0.0, 2.54, 12.7], dtype=np.float32),
+    "QC_Flag": np.array([0, 1, 200], dtype=np.int32),
+})
+ROWS = [" ".join(map(str, r)) for r in [
+    ("KOUN", 35.2, -97.4, 0, 0.0, 0),
+    ("NA", 36.0, -98.0, -15, 2.54, 1),
+    ("G3", 37.5, -99.25, 30, 12.7, 200),
+]]
+
+CASES = {
+    "plain": ROWS,
+    "header": ["MRMS gauge QC file", "explanation line two",
+               "G_ID Lat Lon T_Shift G_Value QC_Flag", *ROWS],
+    "repeated_header": [ROWS[0], "G_ID Lat Lon T_Shift G_Value QC_Flag", *ROWS[1:]],
+    "comments": ["# leading comment", ROWS[0], "   # indented comment",
+                 ROWS[1] + "  # trailing comment", "", ROWS[2]],
+    "short_rows": [ROWS[0], "G4 38.0 -100.0", ROWS[1], "G5", ROWS[2]],
+    "extra_fields": [ROWS[0], ROWS[1] + " 7.5 extra", ROWS[2] + " 1 2 3 4"],
+    "non_finite": [ROWS[0], "G6 nan -100.0 0 1.0 0", ROWS[1], "G7 38.0 -100.0 0 inf 0",
+                   ROWS[2]],
+    "stray_cr_in_header": ["MRMS gauge QC file\rgenerated by qc",
+                           "G_ID Lat Lon T_Shift G_Value QC_Flag", *ROWS],
+    "quotes_and_trailer": [ROWS[0], '"G9 38.0 -100.0 0 1.0', ROWS[1], ROWS[2], "END"],
+}
+
+
+def write(tmp_path, lines, newline="\n"):
+    path = tmp_path / FNAME
+    path.write_bytes((newline.join(lines) + newline).encode())
+    return str(path)
+
+
+def read(fname, typed):
+    return pd.concat(iter_gauge_chunks_pandas(fname, typed=typed), ignore_index=True)
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"], ids=["lf", "crlf"])
+@pytest.mark.parametrize("case", CASES)
+def test_readers_agree(tmp_path, case, newline):
+    fname = write(tmp_path, CASES[case], newline)
+    typed, text = read(fname, typed=True), read(fname, typed=False)
+
+    pd.testing.assert_frame_equal(typed, EXPECTED)
+    pd.testing.assert_frame_equal(text, EXPECTED)
+
+
+def test_non_numeric_field_falls_back_to_text(tmp_path):
+    fname = write(tmp_path, [ROWS[0], "G8 38.0 -100.0 0 T 0", ROWS[1], ROWS[2]])
+
+    with pytest.raises(ValueError):
+        read(fname, typed=True)
+    pd.testing.assert_frame_equal(read(fname, typed=False), EXPECTED)
+
+    df, n_valid = read_gauge_cols(fname)
+    assert n_valid == 3
+    pd.testing.assert_frame_equal(df, EXPECTED)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_small_chunks_match_one_chunk(tmp_path, case):
+    # one line per chunk, so chunks of nothing but short/comment/header lines come up
+    fname = write(tmp_path, CASES[case])
+    for typed in (True, False):
+        chunks = list(iter_gauge_chunks_pandas(fname, typed=typed, chunk_bytes=1))
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), EXPECTED)
+
+
+@pytest.mark.parametrize("lines", [[], ["# only a comment"], ["NO DATA"]],
+                         ids=["empty", "comment_only", "no_data_line"])
+def test_empty_file(tmp_path, lines):
+    fname = write(tmp_path, lines) if lines else str(tmp_path / FNAME)
+    if not lines:
+        (tmp_path / FNAME).write_bytes(b"")
+
+    for typed in (True, False):
+        assert sum(len(c) for c in iter_gauge_chunks_pandas(fname, typed=typed)) == 0
+    df, n_valid = read_gauge_cols(fname)
+    assert n_valid == 0 and list(df.columns) == GAUGE_COLS
+    with pytest.raises(ValueError, match="No valid rows"):
+        parse_gauge_file_to_table1(fname)
+
+
+@pytest.mark.parametrize("qc_keep, ids", [(None, ["KOUN", "NA", "G3"]), ({0}, ["KOUN"]),
+                                          ({1, 200}, ["NA", "G3"]), ({5}, [])])
+def test_qc_keep(tmp_path, qc_keep, ids):
+    fname = write(tmp_path, CASES["header"])
+
+    df, n_valid = read_gauge_cols(fname, qc_keep=qc_keep)
+    assert n_valid == 3  # counted before QC filtering
+    assert df["G_ID"].tolist() == ids
+
+    out = parse_gauge_file_to_table1(fname, qc_keep=qc_keep)
+    assert out["Obs ID"].tolist() == ids
+
+
+def test_table1(tmp_path):
+    out = parse_gauge_file_to_table1(write(tmp_path, CASES["plain"]))
+
+    assert list(out.columns) == ["Obs ID", "Obs value", "Lat.", "Long.", "Time",
+                                 "Q3Rad", "2m_temp", "N"]
+    assert out["Obs ID"].tolist() == ["KOUN", "NA", "G3"]
+    np.testing.assert_array_equal(out["Obs value"].to_numpy(), EXPECTED["G_Value"].to_numpy())
+    assert out["Time"].tolist() == [pd.Timestamp("2025-08-11 23:00", tz="UTC"),
+                                    pd.Timestamp("2025-08-11 22:45", tz="UTC"),
+                                    pd.Timestamp("2025-08-11 23:30", tz="UTC")]
+
+
+def test_obs_id_categories_are_str_when_empty(tmp_path):
+    fname = write(tmp_path, CASES["plain"])
+
+    for qc_keep in (None, {5}):
+        out = parse_gauge_file_to_table1(fname, qc_keep=qc_keep)
+        assert out["Obs ID"].cat.categories.dtype == "str"
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_large_integer_fields_kept_exactly(tmp_path, typed):
+    fname = write(tmp_path, ["G1 35.0 -97.0 -20.9 1.0 40000", "G2 35.0 -97.0 0 1.0 16777217",
+                             "G3 35.0 -97.0 0 1.0 4294967297", "G4 35.0 -97.0 0 1.0 1e30"])
+
+    df = read(fname, typed=typed)
+    assert df["G_ID"].tolist() == ["G1", "G2", "G3"]  # no int64 holds 1e30
+    assert df["T_Shift"].tolist() == [-20, 0, 0]      # truncated, like int(float(x))
+    assert df["QC_Flag"].tolist() == [40000, 16777217, 4294967297]
+
+    assert read_gauge_cols(fname, qc_keep={40000})[0]["G_ID"].tolist() == ["G1"]
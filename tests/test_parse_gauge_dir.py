@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from parse_gauge_dir import parse_gauge_dir
+
+FILES = {
+    "GAUGE_1H_MRMS_QC.20250811.220000": ["A 35.0 -97.0 0 1.0 0", "B 36.0 -98.0 0 2.0 1"],
+    "GAUGE_1H_MRMS_QC.20250811.230000": ["C 37.0 -99.0 -10 3.0 1"],  # nothing with QC 0
+    "GAUGE_1H_MRMS_QC.20250812.000000": ["NO DATA"],
+    "GAUGE_1H_MRMS_QC.20250812.010000": ["A 35.0 -97.0 5 4.0 0", "D 38.0 -100.0 0 5.0 0"],
+}
+
+
+@pytest.fixture
+def gauge_dir(tmp_path):
+    for name, lines in FILES.items():
+        (tmp_path / name).write_text("\n".join(lines) + "\n")
+    (tmp_path / "GAUGE_1H_MRMS_QC.20250812.010000.gz").write_bytes(b"\x1f\x8b junk")
+    return tmp_path
+
+
+@pytest.mark.parametrize("qc_keep, ids", [(None, ["A", "B", "C", "A", "D"]),
+                                          ({0}, ["A", "A", "D"]),
+                                          ({1}, ["B", "C"])])
+def test_mixed_empty_and_nonempty_files(gauge_dir, qc_keep, ids):
+    with pytest.warns(UserWarning, match="20250812.000000"):
+        df = parse_gauge_dir(str(gauge_dir), qc_keep=qc_keep, max_workers=2)
+
+    assert df["Obs ID"].tolist() == ids
+    assert isinstance(df["Obs ID"].dtype, pd.CategoricalDtype)
+    assert df.index.equals(pd.RangeIndex(len(ids)))
+
+
+def test_times_follow_each_file(gauge_dir):
+    with pytest.warns(UserWarning):
+        df = parse_gauge_dir(str(gauge_dir), qc_keep={0})
+
+    assert df["Time"].tolist() == [pd.Timestamp("2025-08-11 22:00", tz="UTC"),
+                                   pd.Timestamp("2025-08-12 01:05", tz="UTC"),
+                                   pd.Timestamp("2025-08-12 01:00", tz="UTC")]
+
+
+def test_no_usable_files(tmp_path):
+    (tmp_path / "GAUGE_1H_MRMS_QC.20250812.000000").write_text("NO DATA\n")
+    with pytest.warns(UserWarning), pytest.raises(ValueError, match="No valid rows in any"):
+        parse_gauge_dir(str(tmp_path))
+    with pytest.raises(ValueError, match="No gauge files"):
+        parse_gauge_dir(str(tmp_path / "missing"))
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("cartopy")
+import matplotlib.image as mimage
+
+import plot_gauge
+
+
+@pytest.fixture
+def fresh_figures(monkeypatch):
+    # Map features would be downloaded from Natural Earth on first draw; skip them
+    from cartopy.mpl.geoaxes import GeoAxes
+    monkeypatch.setattr(GeoAxes, "add_feature", lambda self, *a, **k: None)
+    monkeypatch.setattr(plot_gauge, "_FIGURES", {})
+
+
+def gauges():
+    df = pd.DataFrame({
+        "Lat.":  np.array([35.0, 36.5, 37.2, 38.0, 39.0], dtype=np.float32),
+        "Long.": np.array([-97.4, -98.0, -99.1, -100.0, -101.0], dtype=np.float32),
+    })
+    vals = np.array([0.0, 12.7, 25.4, 3.3, 50.8], dtype=np.float32)
+    return df, vals
+
+
+def plot(tmp_path, name, units_label):
+    df, vals = gauges()
+    if units_label == "in":
+        vals = plot_gauge.mm_to_inches(vals)
+    out = tmp_path / f"{name}.png"
+    plot_gauge.plot_cartopy(df, vals, units_label=units_label, title=name, out_png=out)
+    return mimage.imread(out)
+
+
+@pytest.mark.parametrize("units_label", ["mm", "in"])
+def test_reused_figure_matches_fresh(tmp_path, fresh_figures, units_label):
+    first = plot(tmp_path, "first", units_label)
+    plot(tmp_path, "other", "in" if units_label == "mm" else "mm")
+    again = plot(tmp_path, "first", units_label)
+
+    assert len(plot_gauge._FIGURES) == 1
+    np.testing.assert_array_equal(first, again)
+
+
+@pytest.mark.parametrize("units_label", ["in", "mm"])
+def test_rasterized_gauges_all_drawn(tmp_path, fresh_figures, units_label):
+    pytest.importorskip("datashader")
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame({
+        "Lat.":  rng.uniform(30, 45, n).astype(np.float32),
+        "Long.": rng.uniform(-110, -85, n).astype(np.float32),
+    })
+    vals = np.where(rng.random(n) < 0.5, 0, rng.uniform(0.01, 3, n)).astype(np.float32)
+    plot_gauge.plot_cartopy(df, vals, units_label=units_label, title="dense",
+                            out_png=tmp_path / "dense.png", rasterize=True)
+
+    # both layers (zero and nonzero gauges) are images; no per-gauge markers
+    fig, ax, proj_data, artists = plot_gauge._FIGURES[((10.5, 7.5), 150)][:4]
+    images = [a for a in artists if isinstance(a, mimage.AxesImage)]
+    assert len(images) == 2
+    assert not ax.collections
+    bbox = ax.get_window_extent()
+    for im in images:
+        assert im.get_array().shape == (round(bbox.height), round(bbox.width))
+
+    # every gauge lands on a painted pixel of the rendered map
+    fig.canvas.draw()
+    rgb = np.asarray(fig.canvas.buffer_rgba())[..., :3]
+    xy = ax.projection.transform_points(proj_data, df["Long."].to_numpy(np.float64),
+                                        df["Lat."].to_numpy(np.float64))
+    px = ax.transData.transform(xy[:, :2]).astype(int)
+    painted = (rgb[rgb.shape[0] - 1 - px[:, 1], px[:, 0]] != 255).any(axis=1)
+    assert painted.all()
+
+
+def test_bin_edges_from_mm_stay_in_lower_bin():
+    bins, colors, sizes = plot_gauge.get_nws_bins_and_colors()
+    edges_in = [0.01, 0.05, 0.10, 0.20, 0.40, 0.60, 0.80, 1.00, 1.25, 1.50, 1.75, 2.00,
+                2.50, 3.00, 3.50, 4.00, 5.00]
+    # as a gauge reports it (e.g. "1.27"), stored float32 by parse_gauge
+    mm = np.array([np.float32(f"{b * 25.4:.4f}") for b in edges_in])
+
+    inds = plot_gauge.assign_bins(plot_gauge.mm_to_inches(mm), bins, colors, sizes)[2]
+    np.testing.assert_array_equal(inds, np.arange(len(edges_in)))
+
+    # the colorbar boundaries are the same float32 edges
+    assert plot_gauge._NWS_NORM.boundaries.dtype == np.float32
+    np.testing.assert_array_equal(plot_gauge._NWS_NORM.boundaries[1:], bins)